@@ -1,31 +1,26 @@
 # --- Imports ---------------------------------------------------------------
 # Use pathlib-friendly pytest fixtures and your public API.
+import json
+import os
+import time
+
 import pytest
 from file_integrity_monitor import (
     hash_file,
     scan_directory,
     compare_states,
+    save_state,
+    load_state,
+    STATE_FILE,
+    STATE_DIR,
 )
 
-# --- Helpers ---------------------------------------------------------------
-def _is_hex(s: str) -> bool:
-    """
-    Return True if `s` is a valid hexadecimal string (case-insensitive).
-    Used to sanity-check hash outputs.
-    """
-    try:
-        int(s, 16)
-        return True
-    except ValueError:
-        return False
-
-
 # --- Unit tests ------------------------------------------------------------
-def test_hash_file_sha256_is_64_hex(tmp_path):
+def test_hash_file_sha256_is_32_bytes(tmp_path):
     """
     Create a file *relative to a pytest-managed temp directory* and verify:
       - `hash_file(..., 'sha256')` returns a value
-      - The digest is 64 hex chars (SHA-256)
+      - The digest is 32 raw bytes (SHA-256); hex-encode at display time
     Notes:
       - `tmp_path` is a per-test temporary folder (auto-cleaned by pytest).
       - We use pathlib operations for clarity.
@@ -35,8 +30,8 @@ def test_hash_file_sha256_is_64_hex(tmp_path):
 
     h = hash_file(str(p), "sha256")
     assert h is not None
-    assert len(h) == 64
-    assert _is_hex(h)
+    assert isinstance(h, bytes)
+    assert len(h) == 32
 
 
 def test_hash_file_invalid_algorithm(tmp_path):
@@ -89,3 +84,110 @@ def test_scan_compare_add_modify_remove(tmp_path):
     assert added == []
     assert modified == []
     assert removed == [str(p)]
+
+
+# --- State persistence ------------------------------------------------------
+def _sample_state(root):
+    """
+    Build a small in-memory state spanning several directories (and therefore
+    several shards), with raw-bytes digests as produced by `scan_directory`.
+    """
+    return {
+        os.path.join(root, sub, name): {
+            "h": bytes([i]) * 32,
+            "m": 1000 + i,
+            "s": 10 + i,
+            "i": 100 + i,
+        }
+        for i, (sub, name) in enumerate(
+            [("alpha", "a.txt"), ("alpha", "b.txt"), ("beta", "c.txt"), ("gamma", "d.txt")]
+        )
+    }
+
+
+def test_save_load_state_roundtrip(tmp_path, monkeypatch):
+    """
+    `save_state` writes the sharded `file_hashes.d/` layout and `load_state`
+    reconstructs exactly the same mapping, raw digest bytes included.
+    Notes:
+      - State paths are cwd-relative, so we chdir into the temp dir first.
+    """
+    monkeypatch.chdir(tmp_path)
+    state = _sample_state(str(tmp_path / "watched"))
+
+    save_state(state)
+
+    assert (tmp_path / STATE_DIR).is_dir()
+    assert load_state() == state
+
+
+def test_load_state_migrates_v1_legacy_file(tmp_path, monkeypatch):
+    """
+    A legacy v1 state file (flat path -> hexdigest) still loads: digests come
+    back as raw bytes with no stat triple (forcing a one-time re-hash on the
+    next scan), and the first save converts it to shards and removes the old
+    single file.
+    """
+    monkeypatch.chdir(tmp_path)
+    digest = b"\xab" * 32
+    with open(STATE_FILE, "w") as f:
+        json.dump({"/watched/old.txt": digest.hex()}, f)
+
+    loaded = load_state()
+    assert loaded == {"/watched/old.txt": {"h": digest}}
+
+    # Converting to the sharded layout supersedes the legacy file.
+    save_state(loaded)
+    assert (tmp_path / STATE_DIR).is_dir()
+    assert not (tmp_path / STATE_FILE).exists()
+    assert load_state() == loaded
+
+
+def test_state_roundtrip_with_non_utf8_filename(tmp_path, monkeypatch):
+    """
+    Filenames that aren't valid UTF-8 are legal on Linux and arrive as
+    surrogate-escaped strings (see `os.fsdecode`). They must survive the full
+    scan -> save -> load cycle with either JSON serializer: orjson rejects
+    surrogates outright, so save/load fall back to stdlib json for affected
+    payloads.
+    """
+    monkeypatch.chdir(tmp_path)
+    watched = tmp_path / "watched"
+    watched.mkdir()
+    weird = os.path.join(str(watched), os.fsdecode(b"bad\xff.txt"))
+    with open(weird, "w") as f:
+        f.write("payload")
+
+    state = scan_directory(str(watched), "sha256")
+    assert weird in state
+
+    save_state(state)
+    assert load_state() == state
+    # A crash mid-save used to strand temp files next to the shards.
+    assert not [p for p in (tmp_path / STATE_DIR).iterdir() if p.name.endswith(".tmp")]
+
+
+def test_save_state_incremental_rewrites_only_changed_shards(tmp_path, monkeypatch):
+    """
+    With `changed_paths` given, `save_state` rewrites only the shards holding
+    those paths:
+      1) Full save establishes the shard files
+      2) Modify one entry and save with its path as changed
+      3) Exactly one shard file was rewritten; the reload matches the new state
+    """
+    monkeypatch.chdir(tmp_path)
+    state = _sample_state(str(tmp_path / "watched"))
+    save_state(state)
+
+    shard_dir = tmp_path / STATE_DIR
+    before = {p.name: p.stat().st_mtime_ns for p in shard_dir.iterdir()}
+
+    time.sleep(0.01)  # ensure a rewrite moves the shard's mtime
+    target = os.path.join(str(tmp_path / "watched"), "beta", "c.txt")
+    state[target] = {"h": b"\xff" * 32, "m": 9999, "s": 99, "i": 999}
+    save_state(state, [target])
+
+    after = {p.name: p.stat().st_mtime_ns for p in shard_dir.iterdir()}
+    rewritten = [name for name in after if after[name] != before.get(name)]
+    assert len(rewritten) == 1
+    assert load_state() == state